@@ -1,15 +1,73 @@
 from abc import ABC, abstractmethod
 import inspect
-from typing import Callable, List, Any
+from typing import Callable, FrozenSet, Any
+from collections import namedtuple
 
-from weakref import WeakSet
+from weakref import WeakSet, WeakKeyDictionary, WeakValueDictionary
 from functools import wraps
 
 
 __all__ = ["TrackedInstances", "CallPostInit", "InstancingArgsTracker", "EnumDict"]
 
 
+# parsed __init__ signature of a single class, as used by InstancingArgsTracker
+_SigInfo = namedtuple('_SigInfo', ['arg_names', 'kw_defaults', 'param_names', 'kinds', 'has_var'])
+
+# per-class cache of _SigInfo, populated lazily on first use
+_SIG_CACHE: 'WeakKeyDictionary[type, _SigInfo]' = WeakKeyDictionary()
+
+# instancing parameters that are of no use as tracked metadata
+_DROP_KEYS = ('cls', 'self', 'args', 'kwargs')
+
+
+def _get_sig_info(base: type) -> _SigInfo:
+    """
+    Return the parsed __init__ signature of the given class.
+
+    The result is computed once per class and cached, so subclasses sharing
+    a base do not re-run inspect.signature.
+    """
+    try:
+        return _SIG_CACHE[base]
+    except KeyError:
+        pass
+
+    params = inspect.signature(base).parameters
+    VP, VK, EMPTY = (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD,
+                     inspect.Parameter.empty)
+
+    # split parameters into positional arguments (where default value is
+    # empty) and kw args (where default value defined), in a single pass
+    arg_names = []
+    kw_defaults = {}
+    kinds = []
+    has_var = False
+    for name, p in params.items():
+        kind = p.kind
+        kinds.append(kind)
+        if kind is VP or kind is VK:
+            has_var = True
+        elif p.default is EMPTY:
+            arg_names.append(name)
+        else:
+            kw_defaults[name] = p.default
+
+    info = _SigInfo(tuple(arg_names), kw_defaults, tuple(params), tuple(kinds), has_var)
+    _SIG_CACHE[base] = info
+    return info
+
+
 class TrackedInstances:
+    instances: WeakSet = WeakSet()  # instances of this class only
+    _indexes: dict = {}  # index name -> (key function, WeakValueDictionary, unindexed WeakSet)
+
+    def __init_subclass__(cls, *primeargs, **primekwargs):
+        """
+        Give each subclass its own set of instances and indexes.
+        """
+        super().__init_subclass__(*primeargs, **primekwargs)
+        cls.instances = WeakSet()
+        cls._indexes = {}
 
     def __new__(cls, *args, **kwargs):
         """
@@ -19,25 +77,109 @@ class TrackedInstances:
         but subclasses will inherit this ability.
         """
         instance = object.__new__(cls)
-        if 'instances' not in cls.__dict__.keys():
-            cls.instances = WeakSet()
         cls.instances.add(instance)
+        # keys are computed on the next lookup, once the instance is initialized
+        if cls._indexes:
+            for _, _, pending in cls._indexes.values():
+                pending.add(instance)
         return instance
 
+    @classmethod
+    def register_index(cls, name: str, key_fn: Callable = id):
+        """
+        Index all instances of this class by key, for lookup using get_by.
+
+        Existing instances are indexed immediately. Instances created later are indexed at the first
+        get_by call after their creation, once __init__ has run; later changes to an instance do not
+        re-key it. Keys must be unique: an instance whose key is already used by another live instance
+        is not indexed, and a ValueError is raised.
+
+        :param name: str
+            Name of the index, as passed to get_by.
+        :param key_fn: Callable
+            A callable that accepts one argument (an instance) and returns its hashable key. Defaults
+            to the instance id.
+        """
+        index = WeakValueDictionary()
+        for instance in tuple(cls.instances):
+            cls._index_instance(name, key_fn, index, instance)
+        cls._indexes[name] = (key_fn, index, WeakSet())
+
+    @classmethod
+    def get_by(cls, name: str, key: Any):
+        """
+        Return the instance with the given key in the named index, or None if there is none.
+
+        :param name: str
+            Name of an index registered using register_index.
+        :param key: Any
+            Key of the instance, as returned by the index key function.
+        """
+        if name not in cls._indexes:
+            raise KeyError(f"{cls.__name__} class has no index '{name}'")
+        key_fn, index, pending = cls._indexes[name]
+
+        # index instances created since the last lookup; an instance that
+        # cannot be indexed is dropped, so it only raises once
+        for instance in tuple(pending):
+            pending.discard(instance)
+            cls._index_instance(name, key_fn, index, instance)
+        return index.get(key)
+
+    @classmethod
+    def _index_instance(cls, name: str, key_fn: Callable, index: WeakValueDictionary, instance):
+        """
+        Add one instance to an index, raising ValueError if it cannot be keyed or its key is taken.
+        """
+        try:
+            key = key_fn(instance)
+        except Exception as e:
+            raise ValueError(f"{cls.__name__} index '{name}' cannot key instance {instance!r}: {e!r}") from e
+        existing = index.get(key)
+        if existing is not None and existing is not instance:
+            raise ValueError(f"{cls.__name__} index '{name}' key {key!r} of instance {instance!r} "
+                             f"is already used by instance {existing!r}")
+        index[key] = instance
+
     @classmethod
     def get_instances(cls, selector: Callable) -> set:
         """
-        Search through all instances using the given selector, returning a list where selector is True.
+        Search through all instances using the given selector, returning a set where selector is True.
 
         :param selector: Callable
             A callable (lambda or other function) that accepts one argument (an instance) and returns a bool.
             Calls where selector == True will result in the corresponding instance being included in the
             return.
         """
-        if 'instances' not in cls.__dict__.keys():
-            raise AttributeError(f"{cls.__name__} class has no attribute 'instances'")
-        val = [v for v in cls.instances if selector(v)]
-        return set(val)
+        # snapshot the weak set first, so it is not iterated while selector runs
+        return set(filter(selector, tuple(cls.instances)))
+
+    @classmethod
+    def get_instances_by_attr(cls, attr: str, predicate: Callable) -> set:
+        """
+        Search through all instances by a numeric attribute, applying predicate to all values at once.
+
+        Requires numpy (the 'fast' extra), which is imported on first use.
+
+        :param attr: str
+            Name of the numeric attribute to read from every instance.
+        :param predicate: Callable
+            A callable that accepts a float64 numpy array of the attribute values and returns a boolean
+            mask of the same length. It may be a numba @njit function.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(f"{cls.__name__}.get_instances_by_attr requires numpy") from e
+
+        snapshot = tuple(cls.instances)
+        values = np.fromiter((getattr(v, attr) for v in snapshot),
+                             dtype=np.float64, count=len(snapshot))
+        mask = np.asarray(predicate(values))
+        if mask.dtype != bool or mask.shape != values.shape:
+            raise ValueError(f"predicate returned a {mask.dtype} array of shape {mask.shape}, "
+                             f"expected a bool mask of shape {values.shape}")
+        return {snapshot[i] for i in np.flatnonzero(mask)}
 
     @classmethod
     def inst_and_subcls_inst(cls, exclude=None) -> set:
@@ -47,22 +189,44 @@ class TrackedInstances:
         :param exceptions: List<class>
             A list of subclasses (and subclasses thereof) to except from the instance query.
         """
-        exclude = exclude or []
-        inst = list(cls.instances)
-        for subcls in [v for v in cls.__subclasses__() if v not in exclude]:
-            inst += subcls.inst_and_subcls_inst(exclude=exclude)
-        return set(inst)
+        exclude = set(exclude or ())
+        inst = set()
+
+        # walk the subclass tree with an explicit stack, collecting into one set
+        stack = [cls]
+        while stack:
+            subcls = stack.pop()
+            inst.update(subcls.__dict__.get('instances', ()))
+            stack.extend(v for v in subcls.__subclasses__() if v not in exclude)
+        return inst
 
 
 class CallPostInit(ABC):
     
     def __init_subclass__(cls, *primeargs, **primekwargs):
         super().__init_subclass__(*primeargs, **primekwargs)
-        @wraps(cls.__init__)
-        def new_init(self, *args, init=cls.__init__, **kwargs):
+        init = cls.__init__
+        post = cls.__post_init__
+
+        # no concrete __post_init__ yet (abstract interior class), so there
+        # is nothing to dispatch to; subclasses implementing it get wrapped
+        if post is CallPostInit.__post_init__:
+            return
+
+        # an inherited wrapper already dispatches to the same __post_init__
+        # for this class, since it is the __init__ resolved on the instance's type
+        if getattr(init, '__cpi_post__', None) is post:
+            return
+
+        @wraps(init)
+        def new_init(self, *args, **kwargs):
             init(self, *args, **kwargs)
-            if type(self) == cls:
-                self.__post_init__(*args, **kwargs)
+            # only the outermost wrapper (the one resolved on the instance's
+            # type) calls __post_init__; wrappers of parent classes reached
+            # via super().__init__ fall through
+            if type(self).__init__ is new_init:
+                post(self, *args, **kwargs)
+        new_init.__cpi_post__ = post
         cls.__init__ = new_init
 
     @abstractmethod
@@ -79,73 +243,70 @@ class InstancingArgsTracker(CallPostInit):
     Baseclass for tracking what arguments were used to instantiate a class
     """
     _metadata: dict  # contains the class instancing args
+    _sig_plan: tuple = ((), {})  # (positional names, default values) across the MRO
 
-    def __post_init__(self, *args, **kwargs):
+    def __init_subclass__(cls, *primeargs, **primekwargs):
         """
-        Track all arguments used to instantiate this class.
+        Build the argument binding plan for this class once, at definition.
+
+        The plan is the ordered names that positional instancing args bind
+        to, and the default value of every tracked parameter. Where a name is
+        redefined further up the MRO, the parameter closest to this class wins.
         """
-        # make all args a list (to use 'pop' function), and make return dict
-        args = list(args)
-        data = {}
+        super().__init_subclass__(*primeargs, **primekwargs)
+        names = []
+        defaults = {}
 
         # iterate through all bases defined in the class's inheritance chain
         # order of iteration will be C->B->A for class D inheriting from C,
         # class C inheriting from B, and so on...
-        for base in inspect.getmro(self.__class__):
+        for base in cls.__mro__:
             # identify parameters from the base class __init__ function def
-            params = inspect.signature(base).parameters
-            params_list = list(params.values())
-
-            # build list of all positional arguments (where default value is empty)
-            arg = {
-                k:v for k, v in params.items()
-                if v.default is inspect.Parameter.empty and
-                v.kind not in [inspect.Parameter.VAR_POSITIONAL,
-                               inspect.Parameter.VAR_KEYWORD]
-            }
-            # build list of all kw args (where default value defined)
-            kw = {
-                k:v.default for k, v in params.items()
-                if v.default is not inspect.Parameter.empty and
-                v.kind not in [inspect.Parameter.VAR_POSITIONAL,
-                               inspect.Parameter.VAR_KEYWORD]
-            }
-
-            # insert default arguments into the return dict
-            data.update(**kw)
-
-            # for all positional arguments, assign passed values
-            for k, v in arg.items():
-                data[k] = args.pop(0) if len(args) > 0 else v.default
-
-            # if only positional arguments passed, override default kwarg
-            # value with positional argument
-            for i in range(len(args)):
-                idx = len(arg) + i  # parameter index to set value of
-                # it's possible we have more positional arguments than parameters
-                # when using positional args to pass forward to parent classes
-
-                # don't try assignment if you encounter a *args or **kwargs 
-                if params_list[idx].kind in [inspect.Parameter.VAR_POSITIONAL, 
-                                             inspect.Parameter.VAR_KEYWORD]:
-                    break
-                data[params_list[idx].name] = args.pop(0)
-
-            # if no additional arguments were passed to instantiate a parent
-            # class with **kwargs call, we are done
-            # (speeds execution by approximately 4x by eliminating depth of
-            #  iteration)
-            kinds = [x.kind for x in params_list]
-            if (inspect.Parameter.VAR_POSITIONAL not in kinds and
-                inspect.Parameter.VAR_KEYWORD not in kinds):
+            sig = _get_sig_info(base)
+
+            # positional arguments have no default; kw args keep theirs
+            for k in sig.arg_names:
+                defaults.setdefault(k, inspect.Parameter.empty)
+            for k, v in sig.kw_defaults.items():
+                defaults.setdefault(k, v)
+
+            # positional args fill the positional arguments first, then
+            # override default kwarg values, up to any *args or **kwargs
+            # (extra positional args are passed forward to parent classes)
+            level = list(sig.arg_names)
+            for idx in range(len(sig.arg_names), len(sig.kinds)):
+                if sig.kinds[idx] in [inspect.Parameter.VAR_POSITIONAL,
+                                      inspect.Parameter.VAR_KEYWORD]:
                     break
-        
+                level.append(sig.param_names[idx])
+            # a positional arg bound to a name already bound nearer this class
+            # is not tracked; its slot is bound to None, dropped after binding
+            names += [None if k in names else k for k in level]
+
+            # if no additional arguments can be passed to instantiate a parent
+            # class with *args/**kwargs, we are done
+            if not sig.has_var:
+                break
+
+        cls._sig_plan = (tuple(names), defaults)
+
+    def __post_init__(self, *args, **kwargs):
+        """
+        Track all arguments used to instantiate this class.
+        """
+        names, defaults = self._sig_plan
+
+        # start from the default values, then bind positional args in order
+        data = dict(defaults)
+        data.update(zip(names, args))
+        data.pop(None, None)
+
         # update return dictionary with any kwargs dict passed to the instance
         data.update(**kwargs)
         
         # clean up any 'cls', 'self', 'args', or 'kwargs' parameters, as these
         # are of no use to us
-        for key in ['cls', 'self', 'args', 'kwargs']:
+        for key in _DROP_KEYS:
             data.pop(key, None)
         
         # store the result to the instance _metadata variable
@@ -157,18 +318,37 @@ class InstancingArgsTracker(CallPostInit):
         return self._metadata
 
     @classmethod
-    def get_mro_parameters(cls) -> List[inspect.Parameter]:
+    def get_mro_parameters(cls) -> FrozenSet[inspect.Parameter]:
         """
-        Return a list of parameters for the full MRO of the class.
+        Return the parameters for the full MRO of the class, unique by name.
+
+        Where a name appears at several levels, the parameter closest to this
+        class in the MRO is kept.
         """
-        rtn = []
-        for base in inspect.getmro(cls):
-            rtn += inspect.signature(base).parameters.values()
-        return {v for v in rtn if v.kind not in [inspect.Parameter.VAR_POSITIONAL, 
-                                                 inspect.Parameter.VAR_KEYWORD]}
+        seen = {}
+        VP, VK = inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD
+        for base in cls.__mro__:
+            for name, p in inspect.signature(base).parameters.items():
+                if p.kind is VP or p.kind is VK:
+                    continue
+                seen.setdefault(name, p)
+        return frozenset(seen.values())
 
 
-class EnumDict:
+class _EnumDictMeta(type):
+    """
+    Metaclass blocking assignment to, or deletion of, EnumDict class attributes.
+    """
+    def __setattr__(cls, key: str, value: Any):
+        raise RuntimeError(f"EnumDict '{cls.__name__}' " +
+                           "cannot add or change values during runtime.")
+
+    def __delattr__(cls, key: str):
+        raise RuntimeError(f"EnumDict '{cls.__name__}' " +
+                           "cannot delete values during runtime.")
+
+
+class EnumDict(metaclass=_EnumDictMeta):
     """
     The EnumDict class allows us to access enum elements using dictionary
     functions, which may be desireable in some cases.
@@ -176,17 +356,39 @@ class EnumDict:
     EnumDicts are intended to be immutable in runtime, so new or existing
     value assignments are not permitted.
     """
-    @classmethod
-    def keys(cls) -> set:
-        return {k for k, v in cls.__dict__.items() if not any(
-            [k.startswith('__'), inspect.isfunction(v), inspect.ismethod(v)])}
+    def __setattr__(self, key: str, value: Any):
+        raise RuntimeError(f"EnumDict '{type(self).__name__}' " +
+                           "cannot add or change values during runtime.")
+
+    def __delattr__(self, key: str):
+        raise RuntimeError(f"EnumDict '{type(self).__name__}' " +
+                           "cannot delete values during runtime.")
+
+    _keys: frozenset = frozenset()
+    _values: tuple = ()  # values may be unhashable, so are not stored as a set
+
+    def __init_subclass__(cls, *primeargs, **primekwargs):
+        """
+        Collect the enum keys and values once, at class definition.
+        """
+        super().__init_subclass__(*primeargs, **primekwargs)
+        items = [(k, v) for k, v in cls.__dict__.items() if not any(
+            [k.startswith('__'), inspect.isfunction(v), inspect.ismethod(v)])]
+        # bypass the metaclass, which forbids assignment
+        type.__setattr__(cls, '_keys', frozenset(k for k, _ in items))
+        type.__setattr__(cls, '_values', tuple(v for _, v in items))
 
     @classmethod
-    def values(cls) -> set:
-        return {v for k, v in cls.__dict__.items() if not any(
-            [k.startswith('__'), inspect.isfunction(v), inspect.ismethod(v)])}
+    def keys(cls) -> frozenset:
+        return cls._keys
 
     @classmethod
-    def __setattr__(cls, key: str, value: Any):
-        raise RuntimeError(f"EnumDict '{cls.__name__}'" +
-                           "cannot add or change values during runtime.")
+    def values(cls) -> frozenset:
+        # the set of values is built on first use, as building it requires
+        # every value to be hashable
+        try:
+            return cls.__dict__['_value_set']
+        except KeyError:
+            value_set = frozenset(cls._values)
+            type.__setattr__(cls, '_value_set', value_set)
+            return value_set
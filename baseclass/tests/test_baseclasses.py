@@ -1,6 +1,10 @@
 # 12/9/2023 By MountainEclipse
 
+import importlib.util
+import sys
 import unittest
+from unittest import mock
+from weakref import WeakSet
 from _baseclass import *
 
 
@@ -16,9 +20,11 @@ class TestTrackedInstances(unittest.TestCase):
         pass
 
     def test_new(self):
-        # when creating an instance of a class with tracked instances, 
-        # an 'instances' variable should be created as a WeakSet, and the
-        # new instance should be added.
+        # each class with tracked instances has its own 'instances' WeakSet,
+        # created at class definition, and new instances should be added.
+        self.assertIsInstance(self.Parent.__dict__['instances'], WeakSet)
+        self.assertIsNot(self.Child.instances, self.Parent.instances)
+
         p1 = self.Parent()
         p2 = self.Parent()
 
@@ -32,9 +38,10 @@ class TestTrackedInstances(unittest.TestCase):
         # when instances have been created, a specific instance can be retrieved
         # using the get_instance function, which selects the instance based
         # on a function that returns a bool (true for match, false otherwise)
-        self.assertRaises(AttributeError, self.Parent.get_instances, 
-                          selector=lambda x: x.value==10)
-        
+
+        # before any instancing, there is nothing to select from
+        self.assertEqual(self.Grandchild.get_instances(lambda x: True), set())
+
         p1 = self.Parent()
         p1.value = 10
 
@@ -54,6 +61,84 @@ class TestTrackedInstances(unittest.TestCase):
             self.Parent.get_instances(lambda x: x.value == p2.value),
             {p2})
 
+    @unittest.skipIf(importlib.util.find_spec('numpy') is None, "numpy not installed")
+    def test_get_instances_by_attr(self):
+        # instances can be selected by a numeric attribute, using a predicate
+        # which is applied to an array of the values of all instances at once
+        p1 = self.Parent()
+        p1.value = 10
+
+        p2 = self.Parent()
+        p2.value = 13
+
+        # should return a set object
+        self.assertIsInstance(
+            self.Parent.get_instances_by_attr('value', lambda vals: vals < 0), set)
+
+        # should return the p2 instance as a set
+        self.assertEqual(self.Parent.get_instances_by_attr('value', lambda vals: vals > 11), {p2})
+
+        # the mask must be boolean, with one entry per instance
+        self.assertRaises(ValueError, self.Parent.get_instances_by_attr,
+                          'value', lambda vals: vals[:1] > 11)
+        self.assertRaises(ValueError, self.Parent.get_instances_by_attr,
+                          'value', lambda vals: vals - 10)
+
+    def test_get_instances_by_attr_no_numpy(self):
+        # without numpy, selecting by attribute fails clearly
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            self.assertRaises(ImportError, self.Parent.get_instances_by_attr,
+                              'value', lambda vals: vals > 11)
+
+    def test_get_by(self):
+        # instances can be looked up by key in a registered index, covering
+        # instances created both before and after registration
+        class Indexed(TrackedInstances):
+            def __init__(self, name):
+                self.name = name
+
+        class Unindexed(Indexed):
+            pass
+
+        i1 = Indexed('first')
+        Indexed.register_index('id')
+        Indexed.register_index('name', lambda x: x.name)
+        i2 = Indexed('second')
+
+        self.assertIs(Indexed.get_by('id', id(i1)), i1)
+        self.assertIs(Indexed.get_by('id', id(i2)), i2)
+        self.assertIsNone(Indexed.get_by('id', None))
+
+        # keys may read attributes set in __init__
+        self.assertIs(Indexed.get_by('name', 'first'), i1)
+        self.assertIs(Indexed.get_by('name', 'second'), i2)
+        self.assertIsNone(Indexed.get_by('name', 'third'))
+
+        # indexes are per class, and unknown indexes cannot be searched
+        self.assertRaises(KeyError, Unindexed.get_by, 'id', id(i1))
+
+    def test_get_by_bad_keys(self):
+        # an instance that cannot be keyed, or whose key is already used,
+        # raises once on lookup and is left out of the index
+        class Indexed(TrackedInstances):
+            pass
+
+        i1 = Indexed()
+        i1.n = 1
+        Indexed.register_index('n', lambda x: x.n)
+
+        unkeyed = Indexed()
+        self.assertRaises(ValueError, Indexed.get_by, 'n', 1)
+        self.assertIs(Indexed.get_by('n', 1), i1)
+
+        duplicate = Indexed()
+        duplicate.n = 1
+        self.assertRaises(ValueError, Indexed.get_by, 'n', 1)
+        self.assertIs(Indexed.get_by('n', 1), i1)
+
+        # existing instances are indexed, and checked, at registration
+        self.assertRaises(ValueError, Indexed.register_index, 'n2', lambda x: x.n)
+
     def test_inst_listing(self):
         # all instances and subclass instances can be returned when needed.
         # certain subclasses can be excluded, if an iterable is passed to
@@ -101,6 +186,76 @@ class TestCallPostInit(unittest.TestCase):
         # post-init function should be called, adding 1 to the passed value
         self.assertEqual(ya_post.value, 11)
 
+    def test_post_init_called_once(self):
+        # __post_init__ should be called exactly once per instancing, however
+        # deep the hierarchy and whether or not subclasses define __init__
+        calls = []
+
+        class Parent(CallPostInit):
+            def __init__(self, value):
+                self.value = value
+
+            def __post_init__(self, value):
+                calls.append(type(self))
+
+        class Child(Parent):
+            def __init__(self, value):
+                super().__init__(value)
+
+        class Grandchild(Child):
+            pass
+
+        Parent(1)
+        self.assertEqual(calls, [Parent])
+
+        calls.clear()
+        Child(1)
+        self.assertEqual(calls, [Child])
+
+        calls.clear()
+        Grandchild(1)
+        self.assertEqual(calls, [Grandchild])
+
+        # overriding only __post_init__ should dispatch to the override
+        class Override(Grandchild):
+            def __post_init__(self, value):
+                calls.append('override')
+
+        calls.clear()
+        Override(1)
+        self.assertEqual(calls, ['override'])
+
+    def test_post_init_receives_passed_args(self):
+        # __post_init__ receives exactly the arguments passed at instancing:
+        # keyword arguments stay keyword arguments, positional stay positional
+        calls = []
+
+        class Recorder(CallPostInit):
+            def __init__(self, value):
+                self.value = value
+
+            def __post_init__(self, *args, **kwargs):
+                calls.append((args, kwargs))
+
+        Recorder(value=3)
+        Recorder(4)
+        self.assertEqual(calls, [((), {'value': 3}), ((4,), {})])
+
+    def test_post_init_omits_defaults(self):
+        # defaults omitted at instancing are not passed on to __post_init__,
+        # so it need not accept every parameter of __init__
+        calls = []
+
+        class Defaulted(CallPostInit):
+            def __init__(self, value, flag=False):
+                self.value = value
+
+            def __post_init__(self, value):
+                calls.append(value)
+
+        Defaulted(1)
+        self.assertEqual(calls, [1])
+
 
 class TestInstanceArgs(unittest.TestCase):
 
@@ -209,6 +364,25 @@ class TestInstanceArgs(unittest.TestCase):
         self.assertEqual(set(p.metadata.values()), {'arggc1', 'arggc2', 'argc1', 'argc2', 'argc3', 'argp1', 'argp2', 'argp3'})
         self.assertEqual(p.metadata, ta)
 
+    def test_arg_assignment_base(self) -> None:
+        # the tracker base class takes no arguments, so tracks none
+        self.assertEqual(InstancingArgsTracker().metadata, {})
+
+    def test_arg_assignment_shadowed(self) -> None:
+        # where a parameter name is redefined in a parent class, the value
+        # bound to the parameter closest to the instanced class is tracked
+        class Shadowed(InstancingArgsTracker):
+            def __init__(self, x=1, y=2):
+                pass
+
+        class Shadowing(Shadowed):
+            def __init__(self, x, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+
+        self.assertEqual(Shadowing(5).metadata, {'x': 5, 'y': 2})
+        self.assertEqual(Shadowing(5, 7, 8).metadata, {'x': 5, 'y': 8})
+        self.assertEqual(Shadowing(x=5, y=3).metadata, {'x': 5, 'y': 3})
+
     def test_MRO_params(self) -> None:
         mro_params = self.Parent.get_mro_parameters()
         self.assertEqual(len(mro_params), 3)
@@ -219,6 +393,16 @@ class TestInstanceArgs(unittest.TestCase):
         self.assertEqual({x.name for x in mro_params}, 
                          {'gc1', 'gc2', 'c1', 'c2', 'c3', 'p1', 'p2', 'p3'})
 
+        # parameters are unique by name, keeping the one nearest the class
+        class Shadow(self.Parent):
+            def __init__(self, p3="shadow", *args, **kwargs):
+                super().__init__(*args, **kwargs)
+
+        mro_params = Shadow.get_mro_parameters()
+        self.assertIsInstance(mro_params, frozenset)
+        self.assertEqual(len(mro_params), 3)
+        self.assertEqual({x.name: x.default for x in mro_params}["p3"], "shadow")
+
 
 class TestEnumDict(unittest.TestCase):
 
@@ -231,9 +415,47 @@ class TestEnumDict(unittest.TestCase):
         # ensure the 'keys' function returns all keys of the enum
         self.assertEqual(self.ED.keys(), {"KEY1", "KEY2", "KEY3"})
 
+        # nor is it on instances
+        ed = self.ED()
+        with self.assertRaises(RuntimeError):
+            ed.KEY4 = "value4"
+        with self.assertRaises(RuntimeError):
+            del ed.KEY1
+        self.assertFalse(hasattr(ed, 'KEY4'))
+
         # ensure the 'values' function returns all values of the enum
         self.assertEqual(self.ED.values(), {"value1", "value3", "value2"})
 
-        # attribute setting not permitted for this
-        self.assertRaises(RuntimeError, self.ED.__setattr__, key="KEY4", value="value4")
-    
\ No newline at end of file
+        # attribute setting not permitted for this, whether adding or changing
+        with self.assertRaises(RuntimeError):
+            self.ED.KEY4 = "value4"
+        with self.assertRaises(RuntimeError):
+            self.ED.KEY1 = "value4"
+        self.assertFalse(hasattr(self.ED, 'KEY4'))
+        self.assertEqual(self.ED.KEY1, "value1")
+
+        # attribute deletion not permitted either
+        with self.assertRaises(RuntimeError):
+            del self.ED.KEY1
+        self.assertEqual(self.ED.KEY1, "value1")
+        self.assertEqual(self.ED.keys(), {"KEY1", "KEY2", "KEY3"})
+
+        # nor is it on instances
+        ed = self.ED()
+        with self.assertRaises(RuntimeError):
+            ed.KEY4 = "value4"
+        with self.assertRaises(RuntimeError):
+            del ed.KEY1
+        self.assertFalse(hasattr(ed, 'KEY4'))
+    
+
+    def test_unhashable_values(self):
+        # an EnumDict with unhashable values can be defined and its keys
+        # listed; only building the set of values fails
+        class Unhashable(EnumDict):
+            KEY1 = [1, 2]
+            KEY2 = {"a": 1}
+
+        self.assertEqual(Unhashable.keys(), {"KEY1", "KEY2"})
+        self.assertEqual(Unhashable.KEY1, [1, 2])
+        self.assertRaises(TypeError, Unhashable.values)